@@ -1,14 +1,23 @@
 import jwt
 import datetime
-import uuid
 from functools import wraps
 from flask import Blueprint, request, jsonify, current_app, redirect, url_for
 from extensions import db
 from models import User, Provider
+from security import verify_password, verify_dummy_password, login_throttle, HashingUnavailable, UNUSABLE_PASSWORD
 from .sso import get_sso_handler
 
 auth_bp = Blueprint('auth_api', __name__)
 
+# Maximum number of tokens accepted by a single introspection request
+MAX_INTROSPECT_BATCH = 100
+
+def decode_token(token, secret_key=None):
+    """
+    Verify a system JWT and return its claims.
+    """
+    return jwt.decode(token, secret_key or current_app.config['SECRET_KEY'], algorithms=["HS256"])
+
 def token_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
@@ -23,7 +32,7 @@ def token_required(f):
             return jsonify({'message': 'Token is missing!'}), 401
 
         try:
-            data = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=["HS256"])
+            data = decode_token(token)
             current_user = User.query.filter_by(username=data['username']).first()
             if not current_user:
                  return jsonify({'message': 'User not found!'}), 401
@@ -39,17 +48,42 @@ def token_required(f):
 @auth_bp.route('/login', methods=['POST'])
 def login():
     data = request.get_json()
-    if not data or not data.get('username') or not data.get('password'):
+    if not isinstance(data, dict) or not data.get('username') or not data.get('password'):
         return jsonify({'error': 'Missing username or password'}), 400
 
     username = data.get('username')
     password = data.get('password')
+    if not isinstance(username, str) or not isinstance(password, str):
+        return jsonify({'error': 'Username and password must be strings'}), 400
+
+    # Reject brute-force bursts before doing any hashing work
+    throttle_limits = {
+        f"user:{username}": current_app.config['LOGIN_THROTTLE_MAX_ATTEMPTS'],
+        f"ip:{request.remote_addr}": current_app.config['LOGIN_THROTTLE_MAX_ATTEMPTS_PER_IP']
+    }
+    if not login_throttle.allow(throttle_limits):
+        return jsonify({'error': 'Too many login attempts, please try again later'}), 429
 
     user = User.query.filter_by(username=username).first()
 
-    if not user or user.password != password:
+    try:
+        if user:
+            valid, new_hash = verify_password(user.password, password)
+        else:
+            # Same cost as a real check so response time does not reveal usernames
+            valid, new_hash = verify_dummy_password(password)
+    except HashingUnavailable:
+        return jsonify({'error': 'Server is busy, please try again later'}), 503
+
+    if not valid:
         return jsonify({'error': 'Invalid credentials'}), 401
 
+    # Transparently upgrade plaintext or outdated hashes
+    if new_hash:
+        user.password = new_hash
+        db.session.commit()
+    login_throttle.reset(f"user:{username}")
+
     # Generate JWT
     token = jwt.encode({
         'id': user.id,
@@ -64,6 +98,55 @@ def login():
         'user': user.to_dict()
         })
 
+@auth_bp.route('/introspect', methods=['POST'])
+@token_required
+def introspect(current_user):
+    """
+    Validate a batch of tokens in one call.
+    Results are returned in the same order as the submitted tokens.
+    A token is reported as revoked when its user no longer exists.
+    """
+    data = request.get_json()
+    if not isinstance(data, dict) or not isinstance(data.get('tokens'), list):
+        return jsonify({'error': 'Missing tokens'}), 400
+
+    tokens = data['tokens']
+    if len(tokens) > MAX_INTROSPECT_BATCH:
+        return jsonify({'error': f'At most {MAX_INTROSPECT_BATCH} tokens per request'}), 400
+
+    # Verify all signatures first, sharing the key lookup across the batch
+    secret_key = current_app.config['SECRET_KEY']
+    decoded = []
+    for token in tokens:
+        if not isinstance(token, str) or not token:
+            decoded.append((None, 'Token is malformed!'))
+            continue
+        try:
+            decoded.append((decode_token(token, secret_key), None))
+        except jwt.ExpiredSignatureError:
+            decoded.append((None, 'Token has expired!'))
+        except jwt.InvalidTokenError:
+            decoded.append((None, 'Token is invalid!'))
+
+    # Resolve every referenced user with a single IN query
+    usernames = {claims['username'] for claims, _ in decoded if claims and 'username' in claims}
+    users = {}
+    if usernames:
+        users = {u.username: u for u in User.query.filter(User.username.in_(usernames)).all()}
+
+    results = []
+    for claims, error in decoded:
+        if error:
+            results.append({'active': False, 'revoked': False, 'error': error})
+            continue
+        user = users.get(claims.get('username'))
+        if not user:
+            results.append({'active': False, 'revoked': True, 'claims': claims, 'error': 'User not found!'})
+            continue
+        results.append({'active': True, 'revoked': False, 'claims': claims, 'user': user.to_dict()})
+
+    return jsonify({'results': results})
+
 # --- NEW SSO ROUTES ---
 
 @auth_bp.route('/sso/login/<provider_id>')
@@ -103,7 +186,7 @@ def sso_callback(provider_id):
             user = User(
                 username=sso_user.username,
                 email=sso_user.email,
-                password=str(uuid.uuid4()), # Random password
+                password=UNUSABLE_PASSWORD, # SSO users cannot log in with a password
                 role='user'
             )
             db.session.add(user)
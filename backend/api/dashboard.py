@@ -1,7 +1,9 @@
 from flask import Blueprint, jsonify
-from collections import Counter
+from sqlalchemy import func, case
 from .auth import token_required
+from extensions import db
 from models import Provider
+from profiling import get_profiles, clear_profiles
 
 dashboard_bp = Blueprint('dashboard_api', __name__)
 
@@ -11,17 +13,44 @@ def get_stats(current_user):
     """
     Calculate and return dashboard statistics.
     """
-    all_providers = Provider.query.all()
+    # Aggregate in SQL instead of loading every provider row
+    rows = db.session.query(
+        Provider.type,
+        func.count(Provider.id),
+        func.sum(case((Provider.is_enabled, 1), else_=0))
+    ).group_by(Provider.type).all()
     
-    total_providers = len(all_providers)
-    active_providers = sum(1 for p in all_providers if p.is_enabled)
-    
-    protocol_stats = Counter(p.type for p in all_providers)
+    protocol_stats = {}
+    active_providers = 0
+    for protocol, count, active in rows:
+        protocol_stats[protocol.value if hasattr(protocol, 'value') else protocol] = count
+        active_providers += active or 0
     
     stats = {
-        "totalProviders": total_providers,
+        "totalProviders": sum(protocol_stats.values()),
         "activeProviders": active_providers,
-        "protocolStats": dict(protocol_stats)
+        "protocolStats": protocol_stats
     }
     
     return jsonify(stats)
+
+@dashboard_bp.route('/profiles', methods=['GET'])
+@token_required
+def get_request_profiles(current_user):
+    """
+    Return the stored request profiles (Admin only).
+    """
+    if current_user.role != 'admin':
+        return jsonify({'error': 'Admin privileges required'}), 403
+    return jsonify(get_profiles())
+
+@dashboard_bp.route('/profiles', methods=['DELETE'])
+@token_required
+def clear_request_profiles(current_user):
+    """
+    Discard all stored request profiles (Admin only).
+    """
+    if current_user.role != 'admin':
+        return jsonify({'error': 'Admin privileges required'}), 403
+    clear_profiles()
+    return jsonify({'message': 'Profiles cleared successfully'}), 200
@@ -10,13 +10,21 @@ providers_bp = Blueprint('providers_api', __name__)
 @providers_bp.route('', methods=['GET'])
 def get_providers():
     """Get all providers (Public - Sanitized)."""
-    providers = Provider.query.all()
-    # Sanitize: Remove config which may contain secrets
-    results = []
-    for p in providers:
-        data = p.to_dict()
-        data.pop('config', None)
-        results.append(data)
+    # Select only the public columns: config may contain secrets and is
+    # never loaded or parsed, and rows are serialized without ORM objects.
+    rows = db.session.query(
+        Provider.id, Provider.name, Provider.type, Provider.logo,
+        Provider.is_enabled, Provider.description, Provider.created_at
+    ).all()
+    results = [{
+        'id': row.id,
+        'name': row.name,
+        'type': row.type.value if hasattr(row.type, 'value') else row.type,
+        'logo': row.logo,
+        'isEnabled': row.is_enabled,
+        'description': row.description,
+        'createdAt': row.created_at
+    } for row in rows]
     return jsonify(results)
 
 @providers_bp.route('/<provider_id>', methods=['GET'])
@@ -1,12 +1,54 @@
+import logging
 from authlib.integrations.requests_client import OAuth2Session
 
+import requests
+
 from ..base import SSOHandler
 from ..models import SSOUser
+from ..metadata import metadata_cache
+
+logger = logging.getLogger(__name__)
+
+# Provider config keys and the discovery document fields they map to
+_DISCOVERY_FIELDS = {
+    'authorizationUrl': 'authorization_endpoint',
+    'tokenUrl': 'token_endpoint',
+    'userInfoUrl': 'userinfo_endpoint'
+}
 
 class OIDCHandler(SSOHandler):
     """
     Improved OIDC/OAuth2 handler using Authlib for better security and compliance.
     """
+    def _get_discovery(self, config):
+        # Fetch the OpenID discovery document from the issuer (cached on disk)
+        issuer = config.get('issuer')
+        if not issuer:
+            return {}
+        discovery_url = f"{issuer.rstrip('/')}/.well-known/openid-configuration"
+        try:
+            discovery = metadata_cache.get_json(discovery_url)
+        except requests.RequestException:
+            # Already logged by the metadata cache
+            return {}
+        except ValueError as e:
+            logger.warning("Could not parse OIDC discovery document from %s: %s", discovery_url, e)
+            return {}
+        if not isinstance(discovery, dict):
+            logger.warning("OIDC discovery document from %s is not a JSON object", discovery_url)
+            return {}
+        return discovery
+
+    def _resolve_endpoints(self, config):
+        # Explicit configuration wins; discovery is only consulted for gaps
+        endpoints = {key: config.get(key) for key in _DISCOVERY_FIELDS}
+        if not all(endpoints.values()):
+            discovery = self._get_discovery(config)
+            for key, discovery_key in _DISCOVERY_FIELDS.items():
+                if not endpoints[key]:
+                    endpoints[key] = discovery.get(discovery_key)
+        return endpoints
+
     def get_login_url(self, config, callback_url):
         # Create an Authlib session
         client = OAuth2Session(
@@ -17,7 +59,9 @@ class OIDCHandler(SSOHandler):
         )
         
         # Build the authorization URL
-        authorization_url, state = client.create_authorization_url(config.get('authorizationUrl'))
+        authorization_url, state = client.create_authorization_url(
+            self._resolve_endpoints(config)['authorizationUrl']
+        )
         
         return authorization_url
 
@@ -40,16 +84,18 @@ class OIDCHandler(SSOHandler):
         query_string = "&".join([f"{k}={v}" for k, v in request_params.items()])
         authorization_response = f"{callback_url}?{query_string}"
         
+        endpoints = self._resolve_endpoints(config)
+        token_url = endpoints['tokenUrl']
         token = client.fetch_token(
-            config.get('tokenUrl'),
+            token_url,
             authorization_response=authorization_response
         )
         
         # Fetch user info using the token
-        user_info_url = config.get('userInfoUrl')
+        user_info_url = endpoints['userInfoUrl']
         if not user_info_url:
              # Standard OIDC fallback
-             user_info_url = config.get('tokenUrl').replace('/token', '/userinfo')
+             user_info_url = token_url.replace('/token', '/userinfo')
              
         resp = client.get(user_info_url)
         resp.raise_for_status()
@@ -1,7 +1,13 @@
+import logging
+import requests
 from onelogin.saml2.auth import OneLogin_Saml2_Auth
+from onelogin.saml2.idp_metadata_parser import OneLogin_Saml2_IdPMetadataParser
 from flask import request
 from ..base import SSOHandler
 from ..models import SSOUser
+from ..metadata import metadata_cache
+
+logger = logging.getLogger(__name__)
 
 class SAML2Handler(SSOHandler):
     """
@@ -9,7 +15,7 @@ class SAML2Handler(SSOHandler):
     """
     def _prepare_saml_request(self, config, callback_url):
         # Translate our internal ProviderConfig to python3-saml settings format
-        return {
+        settings = {
             "strict": False, # Set to True in production!
             "debug": True,
             "sp": {
@@ -29,6 +35,38 @@ class SAML2Handler(SSOHandler):
             }
         }
 
+        # Fill in missing IdP details from its published metadata (cached on disk)
+        metadata_url = config.get('metadataUrl')
+        if metadata_url:
+            try:
+                idp_data = OneLogin_Saml2_IdPMetadataParser.parse(
+                    metadata_cache.get(metadata_url),
+                    entity_id=config.get('issuer') or None
+                )
+            except requests.RequestException as e:
+                logger.warning("Could not fetch SAML IdP metadata from %s: %s", metadata_url, e)
+                idp_data = {}
+            except (SyntaxError, ValueError) as e:
+                # lxml's XMLSyntaxError is a SyntaxError; defusedxml errors are ValueErrors
+                logger.warning("Could not parse SAML IdP metadata from %s: %s", metadata_url, e)
+                idp_data = {}
+            else:
+                if not idp_data:
+                    logger.warning("SAML IdP metadata from %s has no IdP descriptor for entity %r",
+                                   metadata_url, config.get('issuer'))
+            settings = OneLogin_Saml2_IdPMetadataParser.merge_settings(settings, idp_data)
+
+            # Explicit configuration wins over the metadata
+            if config.get('issuer'):
+                settings['idp']['entityId'] = config.get('issuer')
+            if config.get('entryPoint'):
+                settings['idp']['singleSignOnService']['url'] = config.get('entryPoint')
+            if config.get('cert'):
+                settings['idp']['x509cert'] = config.get('cert')
+                settings['idp'].pop('x509certMulti', None)
+
+        return settings
+
     def _get_request_data(self):
         # Prepare data structure for python3-saml from Flask request
         return {
@@ -0,0 +1,174 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+import requests
+
+# fcntl is POSIX only; elsewhere snapshot writes fall back to last-writer-wins.
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Bump when the snapshot layout changes; older snapshots are ignored.
+SNAPSHOT_VERSION = 1
+
+DEFAULT_SNAPSHOT_PATH = os.environ.get(
+    'SSO_METADATA_SNAPSHOT',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'instance', 'idp_metadata.json')
+)
+
+
+class MetadataCache:
+    """
+    Cache for IdP metadata (OIDC discovery documents, SAML metadata XML)
+    backed by an on-disk snapshot shared by all workers.
+
+    Cached entries are always served from memory; stale ones are refetched
+    in the background. After a failed fetch the url is not retried for
+    retry_backoff seconds, so a slow or unreachable IdP does not delay logins.
+
+    Snapshot writes merge with the file on disk under an exclusive lock on
+    a sibling ".lock" file, so workers keep each other's entries. Without
+    fcntl (e.g. on Windows) concurrent writers are last-writer-wins.
+    """
+    def __init__(self, snapshot_path, ttl=3600, fetch_timeout=3, retry_backoff=60):
+        self.snapshot_path = os.path.abspath(snapshot_path)
+        self.ttl = ttl
+        self.fetch_timeout = fetch_timeout
+        self.retry_backoff = retry_backoff
+        # Load the snapshot up front so new workers start with warm metadata
+        self._entries = self._read_snapshot_file()
+        self._lock = threading.Lock()
+        # Serializes snapshot writes without blocking readers of _entries
+        self._write_lock = threading.Lock()
+        self._url_locks = {}
+        self._retry_after = {}
+
+    def _read_snapshot_file(self):
+        try:
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if snapshot.get('version') != SNAPSHOT_VERSION:
+            return {}
+        return snapshot.get('entries', {})
+
+    @contextmanager
+    def _file_lock(self):
+        # Cross-process lock held for the whole read-merge-write
+        if fcntl is None:
+            yield
+            return
+        with open(f"{self.snapshot_path}.lock", 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _write_snapshot(self, updates):
+        directory = os.path.dirname(self.snapshot_path)
+        os.makedirs(directory, exist_ok=True)
+        with self._write_lock, self._file_lock():
+            # Merge with entries written by other workers, keeping the newest copy
+            entries = self._read_snapshot_file()
+            for url, entry in updates.items():
+                if url not in entries or entries[url]['fetchedAt'] < entry['fetchedAt']:
+                    entries[url] = entry
+            self._replace_snapshot_file(directory, entries)
+
+    def _replace_snapshot_file(self, directory, entries):
+        # Write to a temp file and rename so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.idp_metadata.')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'version': SNAPSHOT_VERSION, 'entries': entries}, f)
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _url_lock(self, url):
+        with self._lock:
+            return self._url_locks.setdefault(url, threading.Lock())
+
+    def _fetch(self, url):
+        """
+        Fetch url and store it. Must be called with the url lock held.
+        """
+        if time.time() < self._retry_after.get(url, 0):
+            raise requests.ConnectionError(f"Fetching {url} failed recently, retrying later")
+        try:
+            response = requests.get(url, timeout=self.fetch_timeout)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            # Back off so an outage does not cost every request a timeout
+            self._retry_after[url] = time.time() + self.retry_backoff
+            logger.warning("Fetching IdP metadata from %s failed: %s", url, e)
+            raise
+        self._retry_after.pop(url, None)
+
+        with self._lock:
+            self._entries[url] = {'fetchedAt': int(time.time()), 'content': response.text}
+            updates = dict(self._entries)
+
+        # Disk I/O happens outside self._lock so cached reads never wait on it
+        try:
+            self._write_snapshot(updates)
+        except OSError as e:
+            # The in-memory copy still works; the snapshot is best effort
+            logger.warning("Writing IdP metadata snapshot failed: %s", e)
+        return response.text
+
+    def _refresh_in_background(self, url):
+        lock = self._url_lock(url)
+        # Another request is already refreshing this url
+        if not lock.acquire(blocking=False):
+            return
+        if time.time() < self._retry_after.get(url, 0):
+            lock.release()
+            return
+
+        def refresh():
+            try:
+                self._fetch(url)
+            except requests.RequestException:
+                pass
+            finally:
+                lock.release()
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def get(self, url):
+        """
+        Return the metadata document at url as text.
+        A stale copy is returned immediately and refreshed in the background.
+        """
+        with self._lock:
+            entry = self._entries.get(url)
+        if entry:
+            if time.time() - entry['fetchedAt'] >= self.ttl:
+                self._refresh_in_background(url)
+            return entry['content']
+
+        # Nothing cached yet: fetch now, one request per url at a time
+        with self._url_lock(url):
+            with self._lock:
+                entry = self._entries.get(url)
+            if entry:
+                return entry['content']
+            return self._fetch(url)
+
+    def get_json(self, url):
+        return json.loads(self.get(url))
+
+
+metadata_cache = MetadataCache(DEFAULT_SNAPSHOT_PATH)
@@ -3,6 +3,10 @@ import uuid
 from flask import Flask, jsonify
 from flask_cors import CORS
 from extensions import db
+from profiling import init_profiling
+from serialization import get_json_provider_class
+from compression import init_compression
+from security import init_security, hash_password
 from models import User, Provider
 from database import USERS, PROVIDERS
 
@@ -13,6 +17,8 @@ from api.dashboard import dashboard_bp
 
 # App Initialization
 app = Flask(__name__)
+# Use orjson for all JSON responses when it is installed
+app.json = get_json_provider_class()(app)
 
 # App Configuration
 # In a real app, use environment variables for sensitive data.
@@ -20,8 +26,17 @@ app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'a_very_secret_key')
 app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///sso.db'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+# Profiling Configuration
+# Disabled by default. When enabled, admins can profile a single request by
+# sending the X-Profile-Request header, and a fraction of all requests can be sampled.
+app.config['PROFILING_ENABLED'] = os.environ.get('PROFILING_ENABLED', '').lower() in ('1', 'true', 'yes')
+app.config['PROFILING_SAMPLE_RATE'] = float(os.environ.get('PROFILING_SAMPLE_RATE', '0'))
+
 # Initialize Extensions
 db.init_app(app)
+init_profiling(app)
+init_compression(app)
+init_security(app)
 
 # CORS Configuration
 # Allow requests from the Vite development server
@@ -52,7 +67,7 @@ if __name__ == '__main__':
                     id=u_data.get('id', str(uuid.uuid4())),
                     username=u_data['username'],
                     email=u_data['email'],
-                    password=u_data['password'],
+                    password=hash_password(u_data['password']),
                     role=u_data['role']
                 )
                 db.session.add(user)
@@ -0,0 +1,110 @@
+"""
+Benchmark for the provider list serialization path.
+
+Every variant is timed as a full request through the Flask test client, so
+each gain is measured separately:
+
+- ORM objects + to_dict (the original view) vs column rows (current view)
+- stdlib JSON provider vs orjson provider
+- uncompressed vs gzip-compressed responses
+
+Usage: python bench_serialization.py [provider_count]
+"""
+import sys
+import timeit
+from flask import Flask, jsonify
+from flask.json.provider import DefaultJSONProvider
+from extensions import db
+from models import Provider
+from serialization import OrjsonProvider, orjson
+from compression import init_compression
+from api.providers import providers_bp
+
+RUNS = 20
+
+
+def legacy_get_providers():
+    # The provider list view as it was before column selection
+    results = []
+    for p in Provider.query.all():
+        data = p.to_dict()
+        data.pop('config', None)
+        results.append(data)
+    return jsonify(results)
+
+
+def create_bench_app(provider_count, json_provider_class, compress=False):
+    app = Flask(__name__)
+    app.json = json_provider_class(app)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app.config['SECRET_KEY'] = 'bench'
+    db.init_app(app)
+    app.register_blueprint(providers_bp, url_prefix='/api/providers')
+    app.add_url_rule('/legacy/providers', 'legacy_providers', legacy_get_providers)
+    if compress:
+        init_compression(app)
+
+    with app.app_context():
+        db.create_all()
+        for i in range(provider_count):
+            provider = Provider(
+                name=f"Provider {i}",
+                type='OIDC',
+                logo=f"https://example.com/logos/{i}.svg",
+                description=f"Sign in with provider {i}.",
+            )
+            provider.config = {
+                "clientId": f"client-{i}",
+                "clientSecret": f"secret-{i}",
+                "authorizationUrl": "https://idp.example.com/authorize",
+                "tokenUrl": "https://idp.example.com/token",
+                "scopes": "openid profile email"
+            }
+            db.session.add(provider)
+        db.session.commit()
+    return app
+
+
+def time_request(app, path, headers=None):
+    client = app.test_client()
+    seconds = timeit.timeit(lambda: client.get(path, headers=headers), number=RUNS) / RUNS
+    size = len(client.get(path, headers=headers).get_data())
+    return seconds * 1000, size
+
+
+def report(label, result, baseline=None, baseline_label=None):
+    ms, size = result
+    speedup = f"  {baseline[0] / ms:.2f}x vs {baseline_label}" if baseline else ""
+    print(f"{label:<36} {ms:8.2f} ms  {size:9d} bytes{speedup}")
+
+
+def main():
+    provider_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    print(f"providers: {provider_count}, runs per variant: {RUNS}\n")
+
+    stdlib_app = create_bench_app(provider_count, DefaultJSONProvider)
+    legacy = time_request(stdlib_app, '/legacy/providers')
+    columns = time_request(stdlib_app, '/api/providers')
+    report("to_dict rows, stdlib json", legacy)
+    report("column rows, stdlib json", columns, legacy, "to_dict rows")
+
+    if orjson:
+        orjson_app = create_bench_app(provider_count, OrjsonProvider)
+        report("to_dict rows, orjson", time_request(orjson_app, '/legacy/providers'), legacy, "stdlib json")
+        fast = time_request(orjson_app, '/api/providers')
+        report("column rows, orjson", fast, columns, "stdlib json")
+        fast_provider = OrjsonProvider
+    else:
+        print("orjson not installed, skipping orjson variants")
+        fast = columns
+        fast_provider = DefaultJSONProvider
+
+    compressed_app = create_bench_app(provider_count, fast_provider, compress=True)
+    gzip_result = time_request(compressed_app, '/api/providers', {'Accept-Encoding': 'gzip'})
+    report("column rows, fastest json, gzip", gzip_result, fast, "uncompressed")
+    print(f"\ngzip shrinks the response {fast[1] / gzip_result[1]:.1f}x "
+          f"({fast[1]} -> {gzip_result[1]} bytes)")
+
+
+if __name__ == '__main__':
+    main()
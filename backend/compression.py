@@ -0,0 +1,49 @@
+import gzip
+from flask import request
+
+# brotli is optional; without it only gzip is offered.
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def _choose_encoding():
+    # Honour the client's q-values; prefer brotli on ties
+    return request.accept_encodings.best_match(['br', 'gzip'] if brotli else ['gzip'])
+
+
+def _compress(data, encoding, level):
+    if encoding == 'br':
+        return brotli.compress(data, quality=level)
+    return gzip.compress(data, compresslevel=level)
+
+
+def init_compression(app):
+    """
+    Compress large responses according to the client's Accept-Encoding header.
+    """
+    app.config.setdefault('COMPRESS_MIN_SIZE', 1024)
+    app.config.setdefault('COMPRESS_LEVEL', 6)
+    app.config.setdefault('COMPRESS_MIMETYPES', ['application/json', 'text/html', 'text/plain'])
+
+    @app.after_request
+    def compress_response(response):
+        if (response.direct_passthrough
+                or response.is_streamed
+                or response.mimetype not in app.config['COMPRESS_MIMETYPES']
+                or 'Content-Encoding' in response.headers):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        data = response.get_data()
+        if len(data) < app.config['COMPRESS_MIN_SIZE']:
+            return response
+
+        encoding = _choose_encoding()
+        if not encoding:
+            return response
+
+        response.set_data(_compress(data, encoding, app.config['COMPRESS_LEVEL']))
+        response.headers['Content-Encoding'] = encoding
+        return response
@@ -73,7 +73,7 @@ USERS = {
     "admin": {
         "id": "user-1",
         "username": "admin",
-        "password": "admin", # In a real app, use hashed passwords!
+        "password": "admin", # Hashed when seeded into the database
         "email": "admin@example.com",
         "role": "admin"
     }
@@ -16,7 +16,7 @@ class User(db.Model):
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     username = db.Column(db.String(80), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
-    password = db.Column(db.String(255), nullable=False) # In production, this should be hashed!
+    password = db.Column(db.String(255), nullable=False) # argon2 hash, see security.py
     role = db.Column(db.String(20), default='user')
     created_at = db.Column(db.Integer, default=lambda: int(time.time()))
 
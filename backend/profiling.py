@@ -0,0 +1,143 @@
+import cProfile
+import pstats
+import random
+import threading
+import time
+from collections import deque, OrderedDict
+import jwt
+from flask import request, g, current_app
+
+# Header an admin sends to profile a single request on demand
+PROFILE_HEADER = 'X-Profile-Request'
+
+# In-memory store of recent profiles, keyed by "<endpoint>:<provider_id>".
+# Ordered by last update so the stalest key is evicted first.
+_PROFILES = OrderedDict()
+_LOCK = threading.Lock()
+
+# Only one profiler can be active per process (cProfile uses the
+# process-wide sys.monitoring on Python 3.12+)
+_ACTIVE_LOCK = threading.Lock()
+
+
+def _is_admin_request():
+    """
+    Check the bearer token of the current request for an admin role.
+    """
+    auth_header = request.headers.get('Authorization', '')
+    parts = auth_header.split(" ")
+    if len(parts) != 2:
+        return False
+    try:
+        data = jwt.decode(parts[1], current_app.config['SECRET_KEY'], algorithms=["HS256"])
+    except jwt.InvalidTokenError:
+        return False
+    return data.get('role') == 'admin'
+
+
+def _should_profile():
+    if request.headers.get(PROFILE_HEADER) and _is_admin_request():
+        return True
+    sample_rate = current_app.config['PROFILING_SAMPLE_RATE']
+    return sample_rate > 0 and random.random() < sample_rate
+
+
+def _profile_key():
+    endpoint = request.endpoint or request.path
+    provider_id = (request.view_args or {}).get('provider_id', '-')
+    return f"{endpoint}:{provider_id}"
+
+
+def _top_functions(profiler, limit):
+    stats = pstats.Stats(profiler)
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+    results = []
+    for (filename, lineno, func_name), (cc, nc, tt, ct, callers) in rows[:limit]:
+        results.append({
+            'function': f"{filename}:{lineno}({func_name})",
+            'calls': nc,
+            'totalTime': round(tt * 1000, 3),
+            'cumulativeTime': round(ct * 1000, 3)
+        })
+    return results
+
+
+def _start_profile():
+    if not _should_profile():
+        return
+    # Skip this request if another one is already being profiled
+    if not _ACTIVE_LOCK.acquire(blocking=False):
+        return
+    try:
+        profiler = cProfile.Profile()
+        profiler.enable()
+    except Exception:
+        _ACTIVE_LOCK.release()
+        raise
+    g._profile = (profiler, time.perf_counter())
+
+
+def _stop_profile(exc):
+    profile = g.pop('_profile', None)
+    if not profile:
+        return
+    profiler, started = profile
+    try:
+        profiler.disable()
+    finally:
+        _ACTIVE_LOCK.release()
+    duration_ms = (time.perf_counter() - started) * 1000
+
+    record = {
+        'timestamp': int(time.time()),
+        'method': request.method,
+        'durationMs': round(duration_ms, 3),
+        'functions': _top_functions(profiler, current_app.config['PROFILING_TOP_N'])
+    }
+    key = _profile_key()
+    with _LOCK:
+        if key in _PROFILES:
+            _PROFILES.move_to_end(key)
+        else:
+            _PROFILES[key] = deque(maxlen=current_app.config['PROFILING_HISTORY'])
+            # Bound the number of keys, since provider ids come from the URL
+            while len(_PROFILES) > current_app.config['PROFILING_MAX_KEYS']:
+                _PROFILES.popitem(last=False)
+        _PROFILES[key].append(record)
+
+
+def init_profiling(app):
+    """
+    Register the profiling hooks on the app.
+    Nothing is registered unless PROFILING_ENABLED is set, so disabled
+    profiling adds no per-request work.
+
+    Only one request is profiled at a time. On Python 3.12+ cProfile hooks
+    the whole process (sys.monitoring), so with a threaded server a profile
+    may also include functions run by other requests served concurrently.
+    Profile on a single-threaded worker when exact attribution matters.
+    """
+    app.config.setdefault('PROFILING_ENABLED', False)
+    app.config.setdefault('PROFILING_SAMPLE_RATE', 0.0)
+    app.config.setdefault('PROFILING_TOP_N', 25)
+    app.config.setdefault('PROFILING_HISTORY', 10)
+    app.config.setdefault('PROFILING_MAX_KEYS', 100)
+
+    if not app.config['PROFILING_ENABLED']:
+        return
+
+    app.before_request(_start_profile)
+    app.teardown_request(_stop_profile)
+
+
+def get_profiles():
+    """
+    Return a snapshot of the stored profiles.
+    """
+    with _LOCK:
+        return {key: list(records) for key, records in _PROFILES.items()}
+
+
+def clear_profiles():
+    with _LOCK:
+        _PROFILES.clear()
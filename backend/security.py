@@ -0,0 +1,199 @@
+import hmac
+import multiprocessing
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from argon2 import PasswordHasher
+from argon2.exceptions import VerificationError, InvalidHashError
+from flask import current_app
+
+_hasher = PasswordHasher()
+
+# Verified whenever there is no real hash to check (unknown users, SSO users,
+# legacy plaintext rows) so every rejected login costs the same. Built at
+# import, once per process, including each hashing worker.
+_DUMMY_HASH = _hasher.hash('dummy-password')
+
+# Stored for accounts that must not log in with a password (e.g. SSO users).
+# It is never a valid hash and never equal to a submitted password.
+UNUSABLE_PASSWORD = '!'
+
+# Hashing runs in worker processes so it never holds the GIL of the
+# request thread. The pool is created on first use.
+_pool = None
+_pool_slots = None
+_pool_lock = threading.Lock()
+
+
+
+class HashingUnavailable(Exception):
+    """
+    Raised when the hashing pool is saturated, too slow or broken.
+    """
+    pass
+
+
+def _is_hashed(stored):
+    return stored.startswith('$argon2')
+
+
+def _hash(password):
+    return _hasher.hash(password)
+
+
+def _reject(password):
+    # Spend the same argon2 work as a real verification, then fail
+    try:
+        _hasher.verify(_DUMMY_HASH, password)
+    except (VerificationError, InvalidHashError):
+        pass
+    return False, None
+
+
+def _verify(stored, password):
+    """
+    Return (valid, new_hash). new_hash is set when the stored value
+    should be replaced: legacy plaintext rows or outdated parameters.
+    """
+    if stored == UNUSABLE_PASSWORD:
+        return _reject(password)
+
+    if not _is_hashed(stored):
+        if hmac.compare_digest(stored.encode('utf-8'), password.encode('utf-8')):
+            return True, _hasher.hash(password)
+        return _reject(password)
+
+    try:
+        _hasher.verify(stored, password)
+    except (VerificationError, InvalidHashError):
+        return False, None
+
+    if _hasher.check_needs_rehash(stored):
+        return True, _hasher.hash(password)
+    return True, None
+
+
+def _get_pool():
+    global _pool, _pool_slots
+    with _pool_lock:
+        if _pool is None:
+            workers = current_app.config['PASSWORD_HASH_WORKERS']
+            # Never fork the multi-threaded server process
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+            # Bound queued jobs so bursts cannot pile up unbounded work
+            _pool_slots = threading.BoundedSemaphore(workers * 4)
+        return _pool, _pool_slots
+
+
+def _discard_pool(pool):
+    # A worker died: drop the broken pool so the next call starts a new one
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False)
+
+
+def _submit(fn, *args):
+    """
+    Run fn in the hashing pool and wait for the result.
+    Raises HashingUnavailable when the pool is saturated, the job is too
+    slow or the pool is broken.
+    """
+    pool, slots = _get_pool()
+    timeout = current_app.config['PASSWORD_HASH_TIMEOUT']
+    if not slots.acquire(timeout=timeout):
+        raise HashingUnavailable("Password hashing pool is busy")
+
+    try:
+        future = pool.submit(fn, *args)
+    except BrokenProcessPool:
+        slots.release()
+        _discard_pool(pool)
+        raise HashingUnavailable("Password hashing pool is broken")
+    # The slot is held until the job really leaves the pool
+    future.add_done_callback(lambda f: slots.release())
+
+    try:
+        return future.result(timeout=timeout)
+    except TimeoutError:
+        future.cancel()
+        raise HashingUnavailable("Password hashing timed out")
+    except BrokenProcessPool:
+        _discard_pool(pool)
+        raise HashingUnavailable("Password hashing pool is broken")
+
+
+def hash_password(password):
+    return _submit(_hash, password)
+
+
+def verify_password(stored, password):
+    return _submit(_verify, stored, password)
+
+
+def verify_dummy_password(password):
+    """
+    Spend the same work as verify_password for a user that does not exist.
+    """
+    return _submit(_reject, password)
+
+
+class LoginThrottle:
+    """
+    In-memory sliding-window rate limiter for login attempts.
+    """
+    MAX_TRACKED_KEYS = 10000
+
+    def __init__(self):
+        self._attempts = defaultdict(deque)
+        self._lock = threading.Lock()
+
+    def allow(self, limits):
+        """
+        Record an attempt for every key in the {key: max_attempts} mapping,
+        unless one of them is already over its limit, in which case the
+        attempt is rejected.
+        """
+        window = current_app.config['LOGIN_THROTTLE_WINDOW']
+        now = time.monotonic()
+
+        with self._lock:
+            if len(self._attempts) > self.MAX_TRACKED_KEYS:
+                self._sweep(now - window)
+            for key, max_attempts in limits.items():
+                attempts = self._attempts.get(key)
+                if not attempts:
+                    continue
+                while attempts and attempts[0] <= now - window:
+                    attempts.popleft()
+                if len(attempts) >= max_attempts:
+                    return False
+            for key in limits:
+                self._attempts[key].append(now)
+        return True
+
+    def _sweep(self, cutoff):
+        # Drop keys with no attempts left in the window to bound memory
+        for key in [k for k, v in self._attempts.items() if not v or v[-1] <= cutoff]:
+            del self._attempts[key]
+
+    def reset(self, key):
+        with self._lock:
+            self._attempts.pop(key, None)
+
+
+login_throttle = LoginThrottle()
+
+
+def init_security(app):
+    app.config.setdefault('PASSWORD_HASH_WORKERS', 2)
+    app.config.setdefault('PASSWORD_HASH_TIMEOUT', 10)
+    app.config.setdefault('LOGIN_THROTTLE_MAX_ATTEMPTS', 5)
+    app.config.setdefault('LOGIN_THROTTLE_MAX_ATTEMPTS_PER_IP', 20)
+    app.config.setdefault('LOGIN_THROTTLE_WINDOW', 60)
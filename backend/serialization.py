@@ -0,0 +1,43 @@
+from flask.json.provider import DefaultJSONProvider
+
+# orjson is optional. When it is installed, responses are encoded straight to
+# bytes; otherwise Flask's stdlib-based provider is used unchanged.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    JSON provider backed by orjson, compatible with Flask's default provider.
+    """
+    def _options(self, indent=False):
+        # Let dates go through self.default so they are formatted like Flask's provider
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self._options()).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+
+        # Encode directly to bytes, skipping the intermediate str
+        body = orjson.dumps(obj, default=self.default, option=self._options(indent) | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def get_json_provider_class():
+    """
+    Return the fastest JSON provider available in this environment.
+    """
+    return OrjsonProvider if orjson else DefaultJSONProvider
@@ -216,6 +216,12 @@ const ProviderConfigForm: React.FC = () => {
               placeholder="https://idp.example.com/sso/saml"
               required
             />
+            <Input
+              label="IdP Metadata URL"
+              value={formData.config.metadataUrl || ''}
+              onChange={(e) => handleConfigChange('metadataUrl', e.target.value)}
+              placeholder="https://idp.example.com/saml/metadata"
+            />
             <div className="mb-4">
               <label className="block text-[10px] font-bold text-cyan-500/70 uppercase tracking-widest mb-2 ml-1">X.509 Certificate</label>
               <textarea